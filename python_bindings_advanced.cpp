@@ -4,35 +4,16 @@
 #include <stdexcept>
 #include <vector>
 #include <memory>
+#include <atomic>
+#include <deque>
+#include <fstream>
+#include <thread>
 
 namespace py = pybind11;
 
-// 线程安全的解码器池
-class DecoderPool {
-public:
-    DecoderPool(int pool_size = 4) : pool_size_(pool_size) {
-        decoders_.reserve(pool_size);
-        for (int i = 0; i < pool_size; ++i) {
-            auto decoder = std::make_unique<TurboJpegDecoder>();
-            if (!decoder->init()) {
-                throw std::runtime_error("Failed to initialize decoder in pool");
-            }
-            decoders_.push_back(std::move(decoder));
-        }
-    }
-
-    TurboJpegDecoder* acquire() {
-        // 简单的轮询策略
-        int idx = current_index_.fetch_add(1) % pool_size_;
-        return decoders_[idx].get();
-    }
-
-private:
-    std::vector<std::unique_ptr<TurboJpegDecoder>> decoders_;
-    std::atomic<int> current_index_{0};
-    int pool_size_;
-};
-
+// tjhandle 生命周期：每个 TurboJpegDecoder 在 init() 里创建一个
+// 长寿命 handle，析构时 tjDestroy，单次调用不做 init/destroy；
+// 批量解码的每线程 handle 池见 ensure_batch_pool()
 class TurboJpegDecoderWrapper {
 public:
     TurboJpegDecoderWrapper() {
@@ -94,11 +75,86 @@ public:
         uint8_t* data_ptr = static_cast<uint8_t*>(buf.ptr);
         size_t buffer_size = buf.size * sizeof(uint8_t);
 
-        if (!decoder_.decode_to_buffer(filename, data_ptr, buffer_size, width, height, channels)) {
+        // 解码只写调用方持有的 buffer，释放 GIL 让多线程真正并行
+        bool ok;
+        {
+            py::gil_scoped_release release;
+            ok = decoder_.decode_to_buffer(filename, data_ptr, buffer_size,
+                                           width, height, channels);
+        }
+        if (!ok) {
             throw std::runtime_error("Failed to decode image: " + filename);
         }
     }
 
+    // 方法3b: 零拷贝解码内存中的 JPEG 字节（跳过文件 I/O）
+    void decode_bytes_to_buffer(py::bytes jpeg_data,
+                                py::array_t<uint8_t, py::array::c_style | py::array::forcecast> output_buffer) {
+        py::buffer_info buf = output_buffer.request();
+        if (buf.ndim != 2 && buf.ndim != 3) {
+            throw std::runtime_error("Output buffer must be 2D or 3D array");
+        }
+
+        char* src_ptr = nullptr;
+        Py_ssize_t src_len = 0;
+        if (PyBytes_AsStringAndSize(jpeg_data.ptr(), &src_ptr, &src_len) != 0) {
+            throw py::error_already_set();
+        }
+
+        int width, height, channels;
+        uint8_t* data_ptr = static_cast<uint8_t*>(buf.ptr);
+        size_t buffer_size = buf.size * sizeof(uint8_t);
+
+        // 源字节和输出 buffer 都由参数持有，解码期间释放 GIL
+        bool ok;
+        {
+            py::gil_scoped_release release;
+            ok = decoder_.decode_to_buffer(reinterpret_cast<const uint8_t*>(src_ptr),
+                                           static_cast<size_t>(src_len),
+                                           data_ptr, buffer_size,
+                                           width, height, channels);
+        }
+        if (!ok) {
+            throw std::runtime_error("Failed to decode JPEG from memory");
+        }
+    }
+
+    // 方法3c: 分带解码，每解完一带回调一次（cache blocking）
+    void decode_to_buffer_banded(py::bytes jpeg_data,
+                                 py::array_t<uint8_t, py::array::c_style | py::array::forcecast> output_buffer,
+                                 int band_rows,
+                                 py::object band_callback) {
+        py::buffer_info buf = output_buffer.request();
+        if (buf.ndim != 2 && buf.ndim != 3) {
+            throw std::runtime_error("Output buffer must be 2D or 3D array");
+        }
+
+        char* src_ptr = nullptr;
+        Py_ssize_t src_len = 0;
+        if (PyBytes_AsStringAndSize(jpeg_data.ptr(), &src_ptr, &src_len) != 0) {
+            throw py::error_already_set();
+        }
+
+        std::function<void(int, int)> callback;
+        if (!band_callback.is_none()) {
+            callback = [&band_callback](int y_start, int y_end) {
+                band_callback(y_start, y_end);
+            };
+        }
+
+        int width, height, channels;
+        uint8_t* data_ptr = static_cast<uint8_t*>(buf.ptr);
+        size_t buffer_size = buf.size * sizeof(uint8_t);
+
+        if (!decoder_.decode_to_buffer_banded(reinterpret_cast<const uint8_t*>(src_ptr),
+                                              static_cast<size_t>(src_len),
+                                              data_ptr, buffer_size,
+                                              band_rows, callback,
+                                              width, height, channels)) {
+            throw std::runtime_error("Failed to decode JPEG from memory (banded)");
+        }
+    }
+
     // 方法4: 使用快速 DCT（牺牲一点质量换速度）
     py::array_t<uint8_t> decode_fast(const std::string& filename) {
         std::vector<uint8_t> data;
@@ -131,8 +187,140 @@ public:
         }
     }
 
+    // 方法5: 快速 DCT + 快速上采样（速度最快，质量最低）
+    py::array_t<uint8_t> decode_fastest(const std::string& filename) {
+        std::vector<uint8_t> data;
+        int width, height, channels;
+
+        if (!decoder_.decode_fastest(filename, data, width, height, channels)) {
+            throw std::runtime_error("Failed to decode image: " + filename);
+        }
+
+        if (channels == 1) {
+            return py::array_t<uint8_t>(
+                py::buffer_info(
+                    data.data(), sizeof(uint8_t),
+                    py::format_descriptor<uint8_t>::format(),
+                    2, { height, width },
+                    { width * sizeof(uint8_t), sizeof(uint8_t) }
+                )
+            );
+        } else {
+            return py::array_t<uint8_t>(
+                py::buffer_info(
+                    data.data(), sizeof(uint8_t),
+                    py::format_descriptor<uint8_t>::format(),
+                    3, { height, width, channels },
+                    { width * channels * sizeof(uint8_t),
+                      channels * sizeof(uint8_t),
+                      sizeof(uint8_t) }
+                )
+            );
+        }
+    }
+
+    // 方法6: 批量解码 N 张到连续 N×H×W×C tensor
+    // 只跨越一次 Python/C 边界，释放 GIL 后在内部线程间并行
+    void decode_batch(py::list sources,
+                      py::array_t<uint8_t, py::array::c_style | py::array::forcecast> output) {
+        py::buffer_info buf = output.request();
+        if (buf.ndim != 4) {
+            throw std::runtime_error("Output buffer must be a 4D (N, H, W, C) array");
+        }
+
+        const size_t batch_size = py::len(sources);
+        if (static_cast<size_t>(buf.shape[0]) < batch_size) {
+            throw std::runtime_error("Output batch dimension smaller than source list");
+        }
+
+        // 持有 GIL 时提取所有源的内存指针：
+        // bytes 直接取内部指针（sources 列表保证其存活），
+        // 文件名则先读进本地存储
+        std::deque<std::string> file_blobs;
+        std::vector<std::pair<const uint8_t*, size_t>> srcs(batch_size);
+        for (size_t i = 0; i < batch_size; ++i) {
+            py::object item = sources[i];
+            if (py::isinstance<py::bytes>(item)) {
+                char* ptr = nullptr;
+                Py_ssize_t len = 0;
+                if (PyBytes_AsStringAndSize(item.ptr(), &ptr, &len) != 0) {
+                    throw py::error_already_set();
+                }
+                srcs[i] = { reinterpret_cast<const uint8_t*>(ptr),
+                            static_cast<size_t>(len) };
+            } else {
+                std::string filename = item.cast<std::string>();
+                std::ifstream file(filename, std::ios::binary | std::ios::ate);
+                if (!file.is_open()) {
+                    throw std::runtime_error("Failed to open file: " + filename);
+                }
+                std::streamsize size = file.tellg();
+                file.seekg(0, std::ios::beg);
+                file_blobs.emplace_back(static_cast<size_t>(size), '\0');
+                if (!file.read(&file_blobs.back()[0], size)) {
+                    throw std::runtime_error("Failed to read file: " + filename);
+                }
+                srcs[i] = { reinterpret_cast<const uint8_t*>(file_blobs.back().data()),
+                            static_cast<size_t>(size) };
+            }
+        }
+
+        const size_t frame_size = static_cast<size_t>(buf.shape[1])
+                                * buf.shape[2] * buf.shape[3];
+        uint8_t* out_ptr = static_cast<uint8_t*>(buf.ptr);
+
+        size_t num_threads = std::thread::hardware_concurrency();
+        if (num_threads == 0) num_threads = 1;
+        num_threads = std::min(num_threads, batch_size);
+        ensure_batch_pool(num_threads);
+
+        std::atomic<size_t> next_index{0};
+        std::atomic<bool> failed{false};
+
+        {
+            py::gil_scoped_release release;
+
+            auto worker = [&](TurboJpegDecoder* dec) {
+                size_t i;
+                while ((i = next_index.fetch_add(1)) < batch_size) {
+                    int width, height, channels;
+                    if (!dec->decode_to_buffer(srcs[i].first, srcs[i].second,
+                                               out_ptr + i * frame_size, frame_size,
+                                               width, height, channels)) {
+                        failed.store(true);
+                    }
+                }
+            };
+
+            std::vector<std::thread> threads;
+            threads.reserve(num_threads);
+            for (size_t t = 0; t < num_threads; ++t) {
+                threads.emplace_back(worker, batch_decoders_[t].get());
+            }
+            for (auto& th : threads) {
+                th.join();
+            }
+        }
+
+        if (failed.load()) {
+            throw std::runtime_error("Failed to decode one or more images in batch");
+        }
+    }
+
 private:
+    // 惰性建立批量解码用的 tjhandle 池（每线程一个，避免并发共用）
+    void ensure_batch_pool(size_t num_threads) {
+        while (batch_decoders_.size() < num_threads) {
+            auto decoder = std::make_unique<TurboJpegDecoder>();
+            if (!decoder->init()) {
+                throw std::runtime_error("Failed to initialize decoder in batch pool");
+            }
+            batch_decoders_.push_back(std::move(decoder));
+        }
+    }
+
     TurboJpegDecoder decoder_;
+    std::vector<std::unique_ptr<TurboJpegDecoder>> batch_decoders_;
 };
 
 PYBIND11_MODULE(_decoder, m) {
@@ -144,8 +332,23 @@ PYBIND11_MODULE(_decoder, m) {
              "Decode JPEG file to new numpy array (has copy)")
         .def("get_image_info", &TurboJpegDecoderWrapper::get_image_info,
              "Get image dimensions (width, height, channels)")
+        // bytes 重载必须先注册：std::string 也能从 bytes 隐式转换，
+        // 注册在后会把 bytes 当成文件名
+        .def("decode_to_buffer", &TurboJpegDecoderWrapper::decode_bytes_to_buffer,
+             "Decode in-memory JPEG bytes directly to pre-allocated numpy buffer (zero-copy)")
         .def("decode_to_buffer", &TurboJpegDecoderWrapper::decode_to_buffer,
              "Decode JPEG directly to pre-allocated numpy buffer (zero-copy)")
+        .def("decode_to_buffer_banded", &TurboJpegDecoderWrapper::decode_to_buffer_banded,
+             py::arg("jpeg_data"), py::arg("buffer"),
+             py::arg("band_rows") = 64, py::arg("band_callback") = py::none(),
+             "Decode in-memory JPEG in row bands, calling band_callback(y_start, y_end) "
+             "after each band while it is still cache-hot")
         .def("decode_fast", &TurboJpegDecoderWrapper::decode_fast,
-             "Decode JPEG with fast DCT algorithm (slightly lower quality, faster)");
+             "Decode JPEG with accurate DCT + fast upsampling (slightly lower quality, faster)")
+        .def("decode_fastest", &TurboJpegDecoderWrapper::decode_fastest,
+             "Decode JPEG with fast DCT + fast upsampling (maximum speed, lowest quality)")
+        .def("decode_batch", &TurboJpegDecoderWrapper::decode_batch,
+             py::arg("sources"), py::arg("output"),
+             "Decode a list of JPEG paths or bytes into a contiguous (N, H, W, C) "
+             "array in one GIL-released call, parallelized across threads");
 }
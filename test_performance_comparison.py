@@ -8,7 +8,11 @@ TurboJPEG Decoder vs OpenCV 性能对比测试
 import sys
 import os
 import time
+import ctypes
+import platform
+import threading
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
 
 # 确保不导入本地 turbojpeg_decoder 文件夹
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -19,6 +23,10 @@ if current_dir in sys.path:
 import turbojpeg_decoder
 import cv2
 
+# 显式启用 SIMD 优化；单线程解码，与 TurboJPEG 的单线程路径对齐
+cv2.setUseOptimized(True)
+cv2.setNumThreads(1)
+
 print("=" * 80)
 print("TurboJPEG Decoder (已安装的 wheel 包) vs OpenCV 性能对比")
 print("=" * 80)
@@ -40,7 +48,65 @@ width, height, channels = decoder.get_image_info(test_image)
 print(f"图像尺寸: {width} x {height} x {channels}")
 print(f"解码后大小: {width * height * channels / 1024 / 1024:.2f} MB")
 
-NUM_RUNS = 5
+NUM_RUNS = 10
+WARMUP = 2  # 预热迭代：排除冷缓存/页错误/库加载的首轮噪声
+
+# 高精度单调时钟 (纳秒)，避免 time.time() 的毫秒级分辨率和时钟漂移
+now = time.perf_counter_ns
+
+# 预分配一个 64 字节对齐的复用 buffer，所有测试共享
+# 解码会完整覆盖输出，因此用 np.empty 而非 np.zeros（省去整块 memset）
+_pool = np.empty(height * width * channels + 64, dtype=np.uint8)
+_align = (-_pool.ctypes.data) & 63
+buffer_pool = _pool[_align:_align + height * width * channels].reshape(height, width, channels)
+
+# Linux: 建议内核用透明大页承载输出 buffer，把 TLB 项从 ~每 4KB 一条
+# 降到每 2MB 一条（madvise 要求页对齐地址，按 _pool 基址向下取整）
+_page = 4096
+if platform.system() == 'Linux':
+    try:
+        _libc = ctypes.CDLL("libc.so.6", use_errno=True)
+        MADV_HUGEPAGE = 14
+        _addr = _pool.ctypes.data & ~(_page - 1)
+        _length = _pool.ctypes.data + _pool.nbytes - _addr
+        _libc.madvise(ctypes.c_void_p(_addr), ctypes.c_size_t(_length),
+                      MADV_HUGEPAGE)
+    except OSError:
+        pass
+
+# 预触碰每一页：把一次性的缺页开销挪到计时区之外
+_pool[::_page] = 0
+
+def prefetch_file(path):
+    """提示内核把文件预读进页缓存，消除计时循环里的 I/O 抖动。"""
+    if hasattr(os, 'posix_fadvise'):
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+        finally:
+            os.close(fd)
+    else:
+        # Windows/macOS 没有 posix_fadvise，整读一遍达到同样的预热效果
+        with open(path, 'rb') as f:
+            f.read()
+
+
+prefetch_file(test_image)
+
+# 预读 JPEG 字节到内存，供 decode-only 测试使用（剥离文件 I/O 噪声）
+with open(test_image, 'rb') as f:
+    jpeg_bytes = f.read()
+
+
+def diff_stats(a, b):
+    """单遍计算 max/mean 像素差。
+
+    cv2.absdiff 直接在 uint8 上做 SIMD 逐字节 |a-b|，
+    避免 np.abs(a.astype(int16) - b.astype(int16)) 的两个 int16 临时数组
+    (6 倍图像大小的额外内存读写)。
+    """
+    d = cv2.absdiff(np.asarray(a), np.asarray(b))
+    return int(d.max()), float(d.mean())
 
 # ============================================================================
 # 预测试: 将 JPEG 解码并保存为 numpy 格式
@@ -50,20 +116,24 @@ print("预测试: 将 JPEG 解码并保存为 numpy 格式")
 print("=" * 80)
 
 # 使用 TurboJPEG 解码
-buffer_save = np.zeros((height, width, channels), dtype=np.uint8)
+buffer_save = buffer_pool
 decoder.decode_to_buffer(test_image, buffer_save)
 
 # 保存为 numpy 格式
 npy_file = "test.npy"
-start = time.time()
-np.save(npy_file, buffer_save)
-save_time = time.time() - start
+start = now()
+# allow_pickle=False: uint8 连续数组走纯二进制路径，跳过 pickle 元数据开销
+np.save(npy_file, buffer_save, allow_pickle=False)
+save_time = (now() - start) / 1e9
 print(f"\n保存到 {npy_file}: {save_time*1000:.2f} ms")
 
 # 检查文件大小
 npy_size = os.path.getsize(npy_file) / 1024 / 1024
 print(f"文件大小: {npy_size:.2f} MB")
 
+# 确保 .npy 在页缓存里，测试 0 不受回写/驱逐影响
+prefetch_file(npy_file)
+
 # ============================================================================
 # 测试 0: np.load() 读取 numpy 格式 (最快参考)
 # ============================================================================
@@ -71,40 +141,51 @@ print("\n" + "=" * 80)
 print("测试 0: np.load() 读取 numpy 格式 (理论上最快)")
 print("=" * 80)
 
-times_npy = []
+for _ in range(WARMUP):
+    np.copyto(buffer_pool, np.load(npy_file, mmap_mode='r'))
+
+times_npy = np.empty(NUM_RUNS, np.int64)
 for i in range(NUM_RUNS):
-    start = time.time()
-    img_npy = np.load(npy_file)
-    elapsed = time.time() - start
-    times_npy.append(elapsed)
-    print(f"  Run {i+1}: {elapsed*1000:.2f} ms")
-
-avg_npy = sum(times_npy) / len(times_npy)
-print(f"\n  np.load() 平均: {avg_npy*1000:.2f} ms")
+    start = now()
+    # mmap 映射文件，零拷贝进页缓存；copyto 强制实际读入全部字节，
+    # 保证和其他方法（解码出完整图像）公平对比
+    img_npy = np.load(npy_file, mmap_mode='r')
+    np.copyto(buffer_pool, img_npy)
+    elapsed_ns = now() - start
+    times_npy[i] = elapsed_ns
+    print(f"  Run {i+1}: {elapsed_ns/1e6:.2f} ms")
+
+avg_npy = times_npy.min() / 1e9
+print(f"\n  np.load() 最小: {avg_npy*1000:.2f} ms, 中位数: {np.median(times_npy)/1e6:.2f} ms")
 print(f"  图像形状: {img_npy.shape}, 数据类型: {img_npy.dtype}")
 
 # ============================================================================
-# 测试 1: OpenCV imread (基准)
+# 测试 1: OpenCV imdecode (基准)
 # ============================================================================
 print("\n" + "=" * 80)
-print("测试 1: OpenCV imread (基准)")
+print("测试 1: OpenCV imdecode (基准, 仅解码)")
 print("=" * 80)
 
-times_opencv = []
+# imdecode 在缓存的字节上解码，基准只量 DCT+上采样，不量文件 I/O
+jpeg_arr = np.frombuffer(jpeg_bytes, np.uint8)
+for _ in range(WARMUP):
+    cv2.imdecode(jpeg_arr, cv2.IMREAD_COLOR)
+
+times_opencv = np.empty(NUM_RUNS, np.int64)
 for i in range(NUM_RUNS):
-    start = time.time()
-    img_cv = cv2.imread(test_image)
-    elapsed = time.time() - start
-    times_opencv.append(elapsed)
-    print(f"  Run {i+1}: {elapsed*1000:.2f} ms")
-
-avg_opencv = sum(times_opencv) / len(times_opencv)
-print(f"\n  OpenCV 平均: {avg_opencv*1000:.2f} ms")
+    start = now()
+    img_cv = cv2.imdecode(jpeg_arr, cv2.IMREAD_COLOR)
+    elapsed_ns = now() - start
+    times_opencv[i] = elapsed_ns
+    print(f"  Run {i+1}: {elapsed_ns/1e6:.2f} ms")
+
+avg_opencv = times_opencv.min() / 1e9
+print(f"\n  OpenCV 最小: {avg_opencv*1000:.2f} ms, 中位数: {np.median(times_opencv)/1e6:.2f} ms")
 print(f"  图像形状: {img_cv.shape}, 数据类型: {img_cv.dtype}")
 
 # 验证 np.load() 的正确性
-diff_npy = np.abs(img_cv.astype(np.int16) - img_npy.astype(np.int16))
-print(f"\n  np.load() 正确性验证: max_diff={diff_npy.max()}, mean_diff={diff_npy.mean():.4f}")
+max_diff_npy, mean_diff_npy = diff_stats(img_cv, img_npy)
+print(f"\n  np.load() 正确性验证: max_diff={max_diff_npy}, mean_diff={mean_diff_npy:.4f}")
 
 # ============================================================================
 # 测试 2: TurboJPEG 零拷贝解码 (推荐方法)
@@ -113,23 +194,54 @@ print("\n" + "=" * 80)
 print("测试 2: TurboJPEG 零拷贝解码 (推荐方法)")
 print("=" * 80)
 
-buffer = np.zeros((height, width, channels), dtype=np.uint8)
-times_zero_copy = []
+buffer = buffer_pool
+for _ in range(WARMUP):
+    decoder.decode_to_buffer(jpeg_bytes, buffer)
+
+times_zero_copy = np.empty(NUM_RUNS, np.int64)
 
 for i in range(NUM_RUNS):
-    start = time.time()
-    decoder.decode_to_buffer(test_image, buffer)
-    elapsed = time.time() - start
-    times_zero_copy.append(elapsed)
-    print(f"  Run {i+1}: {elapsed*1000:.2f} ms")
-
-avg_zero_copy = sum(times_zero_copy) / len(times_zero_copy)
-print(f"\n  TurboJPEG 零拷贝平均: {avg_zero_copy*1000:.2f} ms")
+    start = now()
+    decoder.decode_to_buffer(jpeg_bytes, buffer)
+    elapsed_ns = now() - start
+    times_zero_copy[i] = elapsed_ns
+    print(f"  Run {i+1}: {elapsed_ns/1e6:.2f} ms")
+
+avg_zero_copy = times_zero_copy.min() / 1e9
+print(f"\n  TurboJPEG 零拷贝最小: {avg_zero_copy*1000:.2f} ms, "
+      f"中位数: {np.median(times_zero_copy)/1e6:.2f} ms")
 print(f"  Buffer 形状: {buffer.shape}, 数据类型: {buffer.dtype}")
 
 # 验证正确性
-diff = np.abs(img_cv.astype(np.int16) - buffer.astype(np.int16))
-print(f"\n  正确性验证: max_diff={diff.max()}, mean_diff={diff.mean():.4f}")
+max_diff_zc, mean_diff_zc = diff_stats(img_cv, buffer)
+print(f"\n  正确性验证: max_diff={max_diff_zc}, mean_diff={mean_diff_zc:.4f}")
+
+# ============================================================================
+# 测试 2b: 分带解码 + 融合校验 (L2 cache blocking)
+# ============================================================================
+print("\n" + "=" * 80)
+print("测试 2b: 分带解码 + 融合校验 (L2 cache blocking)")
+print("=" * 80)
+
+# 带大小取 ~256 KB 输出，对齐到 16 行 (MCU 高度)，保证带内数据留在 L2
+band_rows = max(16, (256 * 1024 // (width * channels) + 15) & ~15)
+
+band_max = 0
+band_sum = 0
+
+def verify_band(y_start, y_end):
+    # 在带刚解码完、还在缓存里时做校验，省掉整图的二次冷读
+    global band_max, band_sum
+    d = cv2.absdiff(img_cv[y_start:y_end], buffer[y_start:y_end])
+    band_max = max(band_max, int(d.max()))
+    band_sum += int(d.sum())
+
+start = now()
+decoder.decode_to_buffer_banded(jpeg_bytes, buffer, band_rows, verify_band)
+elapsed_banded = (now() - start) / 1e9
+print(f"  带高: {band_rows} 行 ({band_rows * width * channels / 1024:.0f} KB/带)")
+print(f"  解码+校验总时间: {elapsed_banded*1000:.2f} ms")
+print(f"  融合校验: max_diff={band_max}, mean_diff={band_sum/buffer.size:.4f}")
 
 # ============================================================================
 # 测试 3: TurboJPEG 标准 decode (有拷贝)
@@ -138,39 +250,66 @@ print("\n" + "=" * 80)
 print("测试 3: TurboJPEG 标准 decode (有拷贝)")
 print("=" * 80)
 
-times_standard = []
+for _ in range(WARMUP):
+    decoder.decode(test_image)
+
+times_standard = np.empty(NUM_RUNS, np.int64)
 for i in range(NUM_RUNS):
-    start = time.time()
+    start = now()
     img_tj = decoder.decode(test_image)
-    elapsed = time.time() - start
-    times_standard.append(elapsed)
-    print(f"  Run {i+1}: {elapsed*1000:.2f} ms")
+    elapsed_ns = now() - start
+    times_standard[i] = elapsed_ns
+    print(f"  Run {i+1}: {elapsed_ns/1e6:.2f} ms")
 
-avg_standard = sum(times_standard) / len(times_standard)
-print(f"\n  TurboJPEG 标准 decode 平均: {avg_standard*1000:.2f} ms")
+avg_standard = times_standard.min() / 1e9
+print(f"\n  TurboJPEG 标准 decode 最小: {avg_standard*1000:.2f} ms, "
+      f"中位数: {np.median(times_standard)/1e6:.2f} ms")
 print(f"  图像形状: {img_tj.shape}, 数据类型: {img_tj.dtype}")
 
 # ============================================================================
 # 测试 4: TurboJPEG Fast DCT
 # ============================================================================
 print("\n" + "=" * 80)
-print("测试 4: TurboJPEG Fast DCT (快速算法)")
+print("测试 4: TurboJPEG 快速变体 (Fast Upsample / Fastest)")
 print("=" * 80)
 
-times_fast = []
+for _ in range(WARMUP):
+    decoder.decode_fast(test_image)
+
+times_fast = np.empty(NUM_RUNS, np.int64)
 for i in range(NUM_RUNS):
-    start = time.time()
+    start = now()
     img_fast = decoder.decode_fast(test_image)
-    elapsed = time.time() - start
-    times_fast.append(elapsed)
-    print(f"  Run {i+1}: {elapsed*1000:.2f} ms")
+    elapsed_ns = now() - start
+    times_fast[i] = elapsed_ns
+    print(f"  Run {i+1}: {elapsed_ns/1e6:.2f} ms")
 
-avg_fast = sum(times_fast) / len(times_fast)
-print(f"\n  TurboJPEG Fast DCT 平均: {avg_fast*1000:.2f} ms")
+avg_fast = times_fast.min() / 1e9
+print(f"\n  TurboJPEG Fast Upsample 最小: {avg_fast*1000:.2f} ms, "
+      f"中位数: {np.median(times_fast)/1e6:.2f} ms")
 
 # 质量对比
-diff_fast = np.abs(img_cv.astype(np.int16) - img_fast.astype(np.int16))
-print(f"\n  质量对比: max_diff={diff_fast.max()}, mean_diff={diff_fast.mean():.4f}")
+max_diff_fast, mean_diff_fast = diff_stats(img_cv, img_fast)
+print(f"\n  质量对比: max_diff={max_diff_fast}, mean_diff={mean_diff_fast:.4f}")
+
+# Fast DCT + Fast Upsample: 三个变体里最快、质量最低
+for _ in range(WARMUP):
+    decoder.decode_fastest(test_image)
+
+times_fastest = np.empty(NUM_RUNS, np.int64)
+for i in range(NUM_RUNS):
+    start = now()
+    img_fastest = decoder.decode_fastest(test_image)
+    elapsed_ns = now() - start
+    times_fastest[i] = elapsed_ns
+    print(f"  Run {i+1} (fastest): {elapsed_ns/1e6:.2f} ms")
+
+avg_fastest = times_fastest.min() / 1e9
+print(f"\n  TurboJPEG Fastest 最小: {avg_fastest*1000:.2f} ms, "
+      f"中位数: {np.median(times_fastest)/1e6:.2f} ms")
+
+max_diff_fastest, mean_diff_fastest = diff_stats(img_cv, img_fastest)
+print(f"\n  质量对比: max_diff={max_diff_fastest}, mean_diff={mean_diff_fastest:.4f}")
 
 # ============================================================================
 # 测试 5: 零拷贝 + Buffer 复用 (视频流场景)
@@ -179,16 +318,113 @@ print("\n" + "=" * 80)
 print("测试 5: 零拷贝 + Buffer 复用 (连续解码 10 次)")
 print("=" * 80)
 
-buffer_reuse = np.zeros((height, width, channels), dtype=np.uint8)
-start = time.time()
+buffer_reuse = buffer_pool
+decoder.decode_to_buffer(jpeg_bytes, buffer_reuse)  # 预热
+
+# 逐次累加整数纳秒：求和无舍入误差，单次耗时低于粗时钟分辨率也不会归零
+total_ns = 0
 for i in range(10):
-    decoder.decode_to_buffer(test_image, buffer_reuse)
-elapsed_reuse = time.time() - start
+    t0 = now()
+    decoder.decode_to_buffer(jpeg_bytes, buffer_reuse)
+    total_ns += now() - t0
+elapsed_reuse = total_ns / 1e9
 avg_reuse = elapsed_reuse / 10
 print(f"  总时间: {elapsed_reuse*1000:.2f} ms")
 print(f"  平均: {avg_reuse*1000:.2f} ms/张")
 print(f"  吞吐量: {10 / elapsed_reuse:.2f} 张/秒")
 
+# ============================================================================
+# 测试 5b: 线程池并行解码 (多核聚合吞吐)
+# ============================================================================
+print("\n" + "=" * 80)
+print("测试 5b: 线程池并行解码 (连续解码 10 次)")
+print("=" * 80)
+
+# 解码器和输出 buffer 绑定到线程本身（thread-local），而不是任务序号：
+# 按 i % num_workers 分配时，两个同时在飞的任务可能撞上同一个 tjhandle
+num_workers = os.cpu_count() or 1
+_tls = threading.local()
+
+def decode_worker(_):
+    if not hasattr(_tls, 'decoder'):
+        _tls.decoder = turbojpeg_decoder.TurboJpegDecoder()
+        _tls.buffer = np.empty((height, width, channels), dtype=np.uint8)
+    _tls.decoder.decode_to_buffer(jpeg_bytes, _tls.buffer)
+
+with ThreadPoolExecutor(max_workers=num_workers) as ex:
+    # 预热：让每个线程先建好自己的解码器，不把初始化算进计时
+    list(ex.map(decode_worker, range(num_workers)))
+
+    start = now()
+    list(ex.map(decode_worker, range(10)))
+    elapsed_parallel = (now() - start) / 1e9
+print(f"  线程数: {num_workers}")
+print(f"  总时间: {elapsed_parallel*1000:.2f} ms")
+print(f"  聚合吞吐量: {10 / elapsed_parallel:.2f} 张/秒")
+
+# ============================================================================
+# 测试 5c: 批量解码 (单次 C 调用, 内部多线程)
+# ============================================================================
+print("\n" + "=" * 80)
+print("测试 5c: decode_batch (10 张, 单次 C 调用)")
+print("=" * 80)
+
+# 一次跨越 Python/C 边界，GIL 在 C 侧释放，线程在内部调度
+batch_out = np.empty((10, height, width, channels), dtype=np.uint8)
+batch_srcs = [jpeg_bytes] * 10
+
+# 预热：建好每线程解码器池，并触发 batch_out 的首次缺页
+decoder.decode_batch(batch_srcs, batch_out)
+
+# 取 3 次中最好的一次，与其他测试口径一致
+batch_ns = None
+for _ in range(3):
+    start = now()
+    decoder.decode_batch(batch_srcs, batch_out)
+    elapsed_ns = now() - start
+    if batch_ns is None or elapsed_ns < batch_ns:
+        batch_ns = elapsed_ns
+elapsed_batch = batch_ns / 1e9
+print(f"  总时间: {elapsed_batch*1000:.2f} ms")
+print(f"  聚合吞吐量: {10 / elapsed_batch:.2f} 张/秒")
+
+# ============================================================================
+# 测试 6: nvJPEG GPU 解码 (可选，无 CUDA 环境自动跳过)
+# ============================================================================
+print("\n" + "=" * 80)
+print("测试 6: nvJPEG GPU 解码 (可选)")
+print("=" * 80)
+
+avg_nvjpeg = None
+try:
+    from nvjpeg import NvJpeg  # pip install pynvjpeg，需要 CUDA 运行时
+except ImportError:
+    print("  未安装 pynvjpeg / 无 CUDA 环境，跳过")
+else:
+    try:
+        nv_decoder = NvJpeg()
+        for _ in range(WARMUP):
+            nv_decoder.decode(jpeg_bytes)
+
+        times_nvjpeg = np.empty(NUM_RUNS, np.int64)
+        for i in range(NUM_RUNS):
+            start = now()
+            img_nv = nv_decoder.decode(jpeg_bytes)
+            elapsed_ns = now() - start
+            times_nvjpeg[i] = elapsed_ns
+            print(f"  Run {i+1}: {elapsed_ns/1e6:.2f} ms")
+
+        avg_nvjpeg = times_nvjpeg.min() / 1e9
+        print(f"\n  nvJPEG 最小: {avg_nvjpeg*1000:.2f} ms, "
+              f"中位数: {np.median(times_nvjpeg)/1e6:.2f} ms")
+
+        max_diff_nv, mean_diff_nv = diff_stats(img_cv, img_nv)
+        print(f"  质量对比: max_diff={max_diff_nv}, mean_diff={mean_diff_nv:.4f}")
+    except Exception as e:
+        # GPU 缺失/显存不足等运行时问题同样只跳过，不影响 CPU 对比
+        print(f"  nvJPEG 初始化或解码失败，跳过: {e}")
+        avg_nvjpeg = None
+
 # ============================================================================
 # 性能总结
 # ============================================================================
@@ -200,19 +436,46 @@ results = [
     ("np.load() (numpy格式)", avg_npy),
     ("TurboJPEG 零拷贝 + 复用", avg_reuse),
     ("TurboJPEG 零拷贝 (单次)", avg_zero_copy),
-    ("TurboJPEG Fast DCT", avg_fast),
+    ("TurboJPEG Fast Upsample", avg_fast),
+    ("TurboJPEG Fastest", avg_fastest),
     ("TurboJPEG 标准 decode", avg_standard),
-    ("OpenCV imread", avg_opencv),
+    ("OpenCV imdecode", avg_opencv),
 ]
 
+if avg_nvjpeg is not None:
+    results.append(("nvJPEG (GPU)", avg_nvjpeg))
+
+# memcpy 微基准：输出带宽的硬上限
+# 接近它的方法是内存带宽受限，远低于它的方法是计算受限 (IDCT/上采样)
+_copy_src = np.empty_like(buffer_pool)
+# 预触碰每一页：必须在展平视图上做，三维数组的 [::4096] 只会跨行步进
+_copy_src.reshape(-1)[::_page] = 0
+# 取 3 次中最好的一次，与其他测试的 warmup+min 口径一致
+copy_ns = None
+for _ in range(3):
+    start = now()
+    np.copyto(buffer_pool, _copy_src)
+    elapsed_ns = now() - start
+    if copy_ns is None or elapsed_ns < copy_ns:
+        copy_ns = elapsed_ns
+copy_bw = buffer_pool.nbytes / (copy_ns / 1e9) / 1e9
+del _copy_src
+
+frame_bytes = buffer_pool.nbytes
+print(f"\nmemcpy 带宽上限: {copy_bw:.2f} GB/s (输出 {frame_bytes/1e6:.0f} MB/张)")
+
 print("\n所有方法性能排名（越快越好）:")
 print("-" * 80)
-print(f"{'排名':<6} {'方法':<30} {'耗时 (ms)':<15} {'相对 OpenCV':<15}")
+print(f"{'排名':<6} {'方法':<30} {'耗时 (ms)':<12} {'GB/s':<10} {'相对 OpenCV':<15}")
 print("-" * 80)
 
-results_sorted = sorted(enumerate(results), key=lambda x: x[1][1])
-for rank, (idx, (name, time_ms)) in enumerate(results_sorted, 1):
-    speedup = avg_opencv / time_ms
+# argsort 一次 C 调用完成排序，省掉 sorted + Python 级 key 函数的逐元素开销
+result_names, result_times = zip(*results)
+order = np.argsort(result_times)
+for rank, idx in enumerate(order, 1):
+    name, time_s = result_names[idx], result_times[idx]
+    bw = frame_bytes / time_s / 1e9
+    speedup = avg_opencv / time_s
     if speedup > 1:
         speedup_str = f"快 {speedup:.2f}x"
     elif speedup < 1:
@@ -221,7 +484,7 @@ for rank, (idx, (name, time_ms)) in enumerate(results_sorted, 1):
         speedup_str = "相同"
 
     marker = "[1st]" if rank == 1 else "[2nd]" if rank == 2 else "[3rd]" if rank == 3 else "     "
-    print(f"{marker} {rank:<4} {name:<30} {time_ms*1000:<15.2f} {speedup_str:<15}")
+    print(f"{marker} {rank:<4} {name:<30} {time_s*1000:<12.2f} {bw:<10.2f} {speedup_str:<15}")
 
 print("-" * 80)
 
@@ -232,8 +495,8 @@ print("\n" + "=" * 80)
 print("最终结论")
 print("=" * 80)
 
-best_time = results_sorted[0][1][1]
-best_name = results_sorted[0][1][0]
+best_time = result_times[order[0]]
+best_name = result_names[order[0]]
 best_speedup = avg_opencv / best_time
 
 print(f"\n最佳方法: {best_name}")
@@ -261,9 +524,8 @@ print(f"""
    → 优势: 快 {avg_opencv/avg_zero_copy:.2f}x，完美质量
 
 3. 追求极限速度:
-   → 使用 Fast DCT decode_fast()
-   → 性能: {avg_fast*1000:.2f} ms
-   → 质量损失: max_diff={diff_fast.max()}（极小）
+   → 使用 decode_fast() (快速上采样): {avg_fast*1000:.2f} ms, max_diff={max_diff_fast}
+   → 使用 decode_fastest() (快速 DCT + 上采样): {avg_fastest*1000:.2f} ms, max_diff={max_diff_fastest}
 
 4. 简单场景:
    → 使用 标准 decode()
@@ -271,7 +533,7 @@ print(f"""
    → 优势: 返回新 array，使用简单
 
 5. 备用方案:
-   → OpenCV imread()
+   → OpenCV imdecode()
    → 性能: {avg_opencv*1000:.2f} ms
 """)
 
@@ -2,6 +2,7 @@
 #define TURBOJPEG_DECODER_H
 
 #include <cstdint>
+#include <functional>
 #include <string>
 #include <vector>
 
@@ -29,15 +30,40 @@ public:
                          size_t buffer_size,
                          int& width, int& height, int& channels);
 
+    // Decode in-memory JPEG data directly to pre-allocated buffer
+    // Skips the file open/read entirely; caller owns the compressed data
+    bool decode_to_buffer(const uint8_t* jpeg_data,
+                         size_t jpeg_size,
+                         uint8_t* output_buffer,
+                         size_t buffer_size,
+                         int& width, int& height, int& channels);
+
+    // Decode in-memory JPEG data in row bands of band_rows scanlines,
+    // invoking band_callback(y_start, y_end) after each band is written.
+    // Keeps each produced band hot in cache for the consumer.
+    bool decode_to_buffer_banded(const uint8_t* jpeg_data,
+                                size_t jpeg_size,
+                                uint8_t* output_buffer,
+                                size_t buffer_size,
+                                int band_rows,
+                                const std::function<void(int, int)>& band_callback,
+                                int& width, int& height, int& channels);
+
     // Get image info without decoding
     bool get_image_info(const std::string& filename,
                        int& width, int& height, int& channels);
 
-    // Decode with fast DCT algorithm (faster but slightly lower quality)
+    // Decode with accurate DCT + fast chroma upsampling
+    // (faster but slightly lower quality)
     bool decode_fast(const std::string& filename,
                      std::vector<uint8_t>& output,
                      int& width, int& height, int& channels);
 
+    // Decode with fast DCT + fast upsampling (maximum speed, lowest quality)
+    bool decode_fastest(const std::string& filename,
+                        std::vector<uint8_t>& output,
+                        int& width, int& height, int& channels);
+
     // Check if initialized
     bool isInitialized() const { return initialized_; }
 